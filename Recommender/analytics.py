@@ -1,15 +1,29 @@
 # Recommender/analytics.py
 
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import numpy as np
 import streamlit as st
-import matplotlib.pyplot as plt
-import seaborn as sns
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 from sklearn.metrics import pairwise_distances
 from sklearn.manifold import TSNE
+from sklearn.preprocessing import StandardScaler
 import plotly.express as px
 import plotly.graph_objects as go
 
+# Optional accelerated t-SNE backends; scikit-learn is used when neither is installed
+try:
+    import cupy
+    from cuml.manifold import TSNE as cuTSNE
+except ImportError:  # pragma: no cover
+    cupy = cuTSNE = None
+
+try:
+    from openTSNE import TSNE as OpenTSNE
+except ImportError:  # pragma: no cover
+    OpenTSNE = None
+
 def show_data_overview(df):
     """Show basic statistics and overview of the dataset."""
     st.header("📊 Dataset Overview")
@@ -35,16 +49,50 @@ def show_data_overview(df):
     
     # Column types
     numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-    categorical_cols = df.select_dtypes(include=['object']).columns.tolist()
+    # Text columns may be object, string or (after loading) category dtype
+    categorical_cols = df.select_dtypes(include=['object', 'string', 'category']).columns.tolist()
     
     st.write(f"**Numeric columns:** {len(numeric_cols)}")
     st.write(f"**Categorical columns:** {len(categorical_cols)}")
 
+# Columns never treated as audio features in the analytics views
+NON_FEATURE_COLS = frozenset(['artist', 'song', 'explicit', 'year', 'genre'])
+
+@st.cache_data(show_spinner=False)
+def _resolve_numeric_features(columns, dtypes):
+    """Resolve numeric feature names from a (columns, dtype names) schema."""
+    feature_cols = []
+    for col, dtype_name in zip(columns, dtypes):
+        if col in NON_FEATURE_COLS:
+            continue
+        dtype = pd.api.types.pandas_dtype(dtype_name)
+        # Mirror select_dtypes(include=[np.number]), which leaves out booleans
+        if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
+            feature_cols.append(col)
+    return feature_cols
+
 def get_numeric_features(df):
-    """Get numeric feature columns for analysis."""
-    exclude_cols = ['artist', 'song', 'explicit', 'year', 'genre']
-    numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-    return [col for col in numeric_cols if col not in exclude_cols]
+    """Get numeric feature columns for analysis (cached per DataFrame schema)."""
+    return _resolve_numeric_features(tuple(df.columns), tuple(df.dtypes.astype(str)))
+
+@st.cache_data(show_spinner=False)
+def _feature_histograms(values, bins=30):
+    """
+    Bin every column of a 2-D feature array, caching the results across reruns.
+
+    Returns:
+        list: (counts, edges) per column, ignoring missing values
+    """
+    finite = np.isfinite(values)
+    col_min = np.min(values, axis=0, where=finite, initial=np.inf)
+    col_max = np.max(values, axis=0, where=finite, initial=-np.inf)
+    
+    histograms = []
+    for i in range(values.shape[1]):
+        column = values[finite[:, i], i]
+        value_range = (col_min[i], col_max[i]) if column.size else (0, 1)
+        histograms.append(np.histogram(column, bins=bins, range=value_range))
+    return histograms
 
 def show_audio_features_distribution(df):
     """Show distribution of audio features."""
@@ -64,19 +112,45 @@ def show_audio_features_distribution(df):
     )
     
     if selected_features:
+        # Bin all selected features from a single float32 array
+        values = df[selected_features].to_numpy(dtype=np.float32, na_value=np.nan)
+        histograms = _feature_histograms(values)
+        
         # Create subplots
         cols = st.columns(2)
-        for idx, feature in enumerate(selected_features):
+        for idx, (feature, (counts, edges)) in enumerate(zip(selected_features, histograms)):
             with cols[idx % 2]:
-                fig, ax = plt.subplots(figsize=(8, 4))
-                ax.hist(df[feature].dropna(), bins=30, alpha=0.7, color='skyblue', edgecolor='black')
-                ax.set_title(f'Distribution of {feature}')
-                ax.set_xlabel(feature)
-                ax.set_ylabel('Frequency')
-                st.pyplot(fig)
+                fig = go.Figure(go.Bar(
+                    x=(edges[:-1] + edges[1:]) / 2,
+                    y=counts,
+                    width=np.diff(edges),
+                    marker=dict(color='skyblue', line=dict(color='black', width=1)),
+                    opacity=0.7
+                ))
+                fig.update_layout(
+                    title=f'Distribution of {feature}',
+                    xaxis_title=feature,
+                    yaxis_title='Frequency',
+                    bargap=0
+                )
+                st.plotly_chart(fig, use_container_width=True)
 
-def show_feature_correlations(df):
-    """Show correlation matrix of audio features."""
+@st.cache_data(show_spinner=False)
+def _correlation_matrix(df, feature_cols):
+    """Pearson correlation of the feature columns as a single centered matrix product (cached)."""
+    A = df[feature_cols].to_numpy(dtype=np.float32, na_value=np.nan)
+    
+    # Center each column; missing values are imputed with the column mean (0 once centered)
+    col_means = np.nanmean(A, axis=0)
+    A = np.where(np.isnan(A), np.float32(0), A - col_means)
+    
+    norms = np.linalg.norm(A, axis=0)
+    A /= np.where(norms == 0, 1, norms)
+    
+    return pd.DataFrame(A.T @ A, index=feature_cols, columns=feature_cols)
+
+def show_feature_correlations(df, corr_matrix=None):
+    """Show correlation matrix of audio features (optionally precomputed)."""
     st.header("🔗 Feature Correlations")
     
     feature_cols = get_numeric_features(df)
@@ -86,38 +160,107 @@ def show_feature_correlations(df):
         return
     
     # Calculate correlation matrix
-    corr_matrix = df[feature_cols].corr()
+    if corr_matrix is None:
+        corr_matrix = _correlation_matrix(df, feature_cols)
     
     # Plot correlation heatmap
-    fig, ax = plt.subplots(figsize=(12, 10))
-    sns.heatmap(corr_matrix, 
-                annot=True, 
-                cmap='coolwarm', 
-                center=0,
-                square=True,
-                ax=ax)
-    ax.set_title('Audio Features Correlation Matrix')
-    st.pyplot(fig)
+    fig = px.imshow(
+        corr_matrix,
+        text_auto='.2f',
+        color_continuous_scale='RdBu_r',
+        zmin=-1,
+        zmax=1,
+        aspect='equal',
+        title='Audio Features Correlation Matrix'
+    )
+    st.plotly_chart(fig, use_container_width=True)
     
     # Show strongest correlations
     st.subheader("Strongest Correlations")
-    corr_pairs = []
-    for i in range(len(corr_matrix.columns)):
-        for j in range(i+1, len(corr_matrix.columns)):
-            corr_pairs.append({
-                'Feature 1': corr_matrix.columns[i],
-                'Feature 2': corr_matrix.columns[j],
-                'Correlation': corr_matrix.iloc[i, j]
-            })
-    
-    corr_df = pd.DataFrame(corr_pairs)
-    corr_df['Abs Correlation'] = corr_df['Correlation'].abs()
+    # Pull every unique feature pair from the upper triangle in one vectorized step
+    corr_values = corr_matrix.to_numpy()
+    rows, cols = np.triu_indices_from(corr_values, k=1)
+    feature_names = corr_matrix.columns.to_numpy()
+    
+    corr_df = pd.DataFrame({
+        'Feature 1': feature_names[rows],
+        'Feature 2': feature_names[cols],
+        'Correlation': corr_values[rows, cols]
+    })
+    corr_df['Abs Correlation'] = np.abs(corr_df['Correlation'].to_numpy())
     top_correlations = corr_df.nlargest(10, 'Abs Correlation')
     
     st.dataframe(top_correlations.style.background_gradient(subset=['Correlation'], cmap='coolwarm'))
 
-def show_music_clusters(df):
-    """Show clustering of songs based on audio features."""
+# Maximum number of songs embedded by t-SNE; larger datasets are subsampled
+TSNE_MAX_SAMPLES = 5000
+
+# Gradient steps for scikit-learn's Barnes-Hut t-SNE; PCA init on standardized
+# features converges well before the default 1000
+TSNE_MAX_ITER = 750
+
+@st.cache_data(show_spinner=False)
+def _compute_tsne_embedding(X):
+    """
+    Fit t-SNE on the feature matrix and return the 2-D embedding (cached across reruns).
+
+    Uses cuML on the GPU when available, then multi-threaded openTSNE, and
+    falls back to scikit-learn otherwise.
+    """
+    perplexity = min(30, len(X)-1)
+    
+    if cuTSNE is not None and cupy.cuda.is_available():
+        X_gpu = cupy.asarray(X, dtype='float32')
+        tsne = cuTSNE(n_components=2, perplexity=perplexity, random_state=42)
+        return cupy.asnumpy(tsne.fit_transform(X_gpu))
+    
+    if OpenTSNE is not None:
+        tsne = OpenTSNE(
+            n_components=2,
+            perplexity=perplexity,
+            initialization='pca',
+            negative_gradient_method='auto',
+            n_jobs=-1,
+            random_state=42
+        )
+        return np.asarray(tsne.fit(np.asarray(X, dtype=np.float64)))
+    
+    tsne = TSNE(
+        n_components=2,
+        random_state=42,
+        perplexity=perplexity,
+        init='pca',
+        learning_rate='auto',
+        max_iter=TSNE_MAX_ITER,
+        n_jobs=-1
+    )
+    return tsne.fit_transform(X)
+
+def _compute_cluster_embedding(df, feature_cols):
+    """
+    Subsample, standardize and embed the songs shown in the clusters tab.
+
+    Returns:
+        tuple: (sample_idx, X_embedded) where sample_idx is None when every song is embedded
+    """
+    # Single float32 copy of the features; missing values are zeroed in place only if present
+    X = df[feature_cols].to_numpy(dtype=np.float32, na_value=np.nan)
+    if np.isnan(X).any():
+        np.nan_to_num(X, copy=False)
+    sample_idx = None
+    
+    # Subsample large datasets; t-SNE cost grows quickly with the number of songs
+    if len(X) > TSNE_MAX_SAMPLES:
+        sample_idx = np.random.default_rng(42).choice(len(X), TSNE_MAX_SAMPLES, replace=False)
+        X = X[sample_idx]
+    
+    # Standardize in place first so no single feature (e.g. duration_ms) dominates
+    # the distances or the PCA initialization
+    X_scaled = StandardScaler(copy=False).fit_transform(X)
+    return sample_idx, _compute_tsne_embedding(X_scaled)
+
+def show_music_clusters(df, cluster_embedding=None):
+    """Show clustering of songs based on audio features (optionally precomputed)."""
     st.header("🎯 Music Clustering Analysis")
     
     feature_cols = get_numeric_features(df)
@@ -126,20 +269,23 @@ def show_music_clusters(df):
         st.warning("Need at least 3 numeric features for clustering visualization.")
         return
     
-    # Prepare data
-    X = df[feature_cols].fillna(0)
-    
     # t-SNE for dimensionality reduction
-    with st.spinner("Performing dimensionality reduction..."):
-        tsne = TSNE(n_components=2, random_state=42, perplexity=min(30, len(X)-1))
-        X_embedded = tsne.fit_transform(X)
+    if cluster_embedding is None:
+        with st.spinner("Performing dimensionality reduction..."):
+            cluster_embedding = _compute_cluster_embedding(df, feature_cols)
+    
+    sample_idx, X_embedded = cluster_embedding
+    songs = df
+    if sample_idx is not None:
+        songs = df.iloc[sample_idx]
+        st.caption(f"Showing a random sample of {TSNE_MAX_SAMPLES} of {len(df)} songs.")
     
     # Create interactive plot
     plot_df = pd.DataFrame({
         'x': X_embedded[:, 0],
         'y': X_embedded[:, 1],
-        'song': df['song'],
-        'artist': df['artist']
+        'song': songs['song'].to_numpy(),
+        'artist': songs['artist'].to_numpy()
     })
     
     fig = px.scatter(plot_df, x='x', y='y', hover_data=['song', 'artist'],
@@ -161,30 +307,39 @@ def show_recommendation_metrics(df, recommendations_history=None):
     
     if recommendations_history:
         st.subheader("Recent Recommendations")
-        for i, (song, recs) in enumerate(recommendations_history[-5:], 1):
-            st.write(f"{i}. **{song}** → {len(recs)} recommendations")
+        for i, (song, n_recs) in enumerate(list(recommendations_history)[-5:], 1):
+            st.write(f"{i}. **{song}** → {n_recs} recommendations")
     
     # Model quality metrics
     st.subheader("Model Quality Indicators")
     
+    # Resolve the feature columns once and reduce over a single float32 array
+    feature_cols = get_numeric_features(df)
+    features = df[feature_cols].to_numpy(dtype=np.float32, na_value=np.nan)
+    
     col1, col2, col3 = st.columns(3)
     
     with col1:
         # Feature coverage
-        feature_coverage = len(get_numeric_features(df)) / 12  # 12 is max typical features
+        feature_coverage = len(feature_cols) / 12  # 12 is max typical features
         st.metric("Feature Coverage", f"{feature_coverage:.1%}")
     
     with col2:
         # Data quality
-        missing_ratio = df[get_numeric_features(df)].isnull().sum().sum() / (len(df) * len(get_numeric_features(df)))
+        missing_ratio = np.isnan(features).mean()
         st.metric("Data Quality", f"{(1-missing_ratio):.1%}")
     
     with col3:
         # Diversity score (based on feature variance)
-        feature_vars = df[get_numeric_features(df)].var().mean()
+        feature_vars = np.nanvar(features, axis=0, ddof=1).mean()
         diversity_score = min(feature_vars * 100, 100)  # Normalized score
         st.metric("Music Diversity", f"{diversity_score:.0f}/100")
 
+@st.cache_data(show_spinner=False)
+def _top_artist_counts(artists, n=10):
+    """Count songs per artist and keep the top n, cached across reruns."""
+    return artists.value_counts().head(n)
+
 def show_artist_insights(df):
     """Show insights about artists in the dataset."""
     st.header("🎤 Artist Insights")
@@ -194,14 +349,20 @@ def show_artist_insights(df):
         return
     
     # Top artists by song count
-    artist_counts = df['artist'].value_counts().head(10)
-    
-    fig, ax = plt.subplots(figsize=(10, 6))
-    artist_counts.plot(kind='barh', ax=ax, color='lightcoral')
-    ax.set_title('Top 10 Artists by Number of Songs')
-    ax.set_xlabel('Number of Songs')
-    plt.tight_layout()
-    st.pyplot(fig)
+    artist_counts = _top_artist_counts(df['artist'])
+    
+    fig = go.Figure(go.Bar(
+        x=artist_counts.to_numpy(),
+        y=artist_counts.index.astype(str),
+        orientation='h',
+        marker_color='lightcoral'
+    ))
+    fig.update_layout(
+        title='Top 10 Artists by Number of Songs',
+        xaxis_title='Number of Songs',
+        yaxis=dict(autorange='reversed')
+    )
+    st.plotly_chart(fig, use_container_width=True)
     
     # Artist audio characteristics
     st.subheader("Artist Audio Profiles")
@@ -212,21 +373,45 @@ def show_artist_insights(df):
     if feature_cols:
         selected_feature = st.selectbox("Select feature to compare artists:", feature_cols)
         
-        artist_means = df.groupby('artist')[selected_feature].mean().loc[top_artists]
+        # Group only the rows of the top artists instead of every artist in the dataset
+        top_rows = df.loc[df['artist'].isin(top_artists), ['artist', selected_feature]]
+        artist_means = (
+            top_rows.groupby('artist', sort=False, observed=True)[selected_feature]
+            .mean()
+            .reindex(top_artists)
+        )
         
-        fig, ax = plt.subplots(figsize=(10, 6))
-        artist_means.plot(kind='bar', ax=ax, color='lightgreen')
-        ax.set_title(f'Average {selected_feature} by Artist')
-        ax.set_ylabel(selected_feature) # type: ignore
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        st.pyplot(fig)
+        fig = go.Figure(go.Bar(
+            x=artist_means.index.astype(str),
+            y=artist_means.to_numpy(),
+            marker_color='lightgreen'
+        ))
+        fig.update_layout(
+            title=f'Average {selected_feature} by Artist',
+            yaxis_title=selected_feature,
+            xaxis_tickangle=-45
+        )
+        st.plotly_chart(fig, use_container_width=True)
 
 def show_analytics_dashboard(df, recommendations_history=None):
     """Main function to display the complete analytics dashboard."""
     
     st.title("📊 Music Recommender Analytics")
     
+    feature_cols = get_numeric_features(df)
+    
+    # Start the heavy correlation and t-SNE work in the background while the
+    # lighter tabs render; numpy/sklearn release the GIL for the numeric work.
+    # Workers share the script context so cached helpers behave as on the main thread.
+    executor = ThreadPoolExecutor(
+        max_workers=2,
+        initializer=add_script_run_ctx,
+        initargs=(None, get_script_run_ctx())
+    )
+    corr_future = executor.submit(_correlation_matrix, df, feature_cols) if len(feature_cols) >= 2 else None
+    cluster_future = executor.submit(_compute_cluster_embedding, df, feature_cols) if len(feature_cols) >= 3 else None
+    executor.shutdown(wait=False)
+    
     # Create tabs for different analytics sections
     tab1, tab2, tab3, tab4, tab5 = st.tabs([
         "📈 Overview", 
@@ -244,21 +429,25 @@ def show_analytics_dashboard(df, recommendations_history=None):
         show_audio_features_distribution(df)
     
     with tab3:
-        show_feature_correlations(df)
+        show_feature_correlations(df, corr_future.result() if corr_future else None)
     
     with tab4:
-        show_music_clusters(df)
+        cluster_embedding = None
+        if cluster_future:
+            with st.spinner("Performing dimensionality reduction..."):
+                cluster_embedding = cluster_future.result()
+        show_music_clusters(df, cluster_embedding)
     
     with tab5:
         show_artist_insights(df)
 
 def track_recommendation(base_song, recommendations, history_dict, max_history=10):
     """Track recommendation history for analytics."""
-    if 'recommendations_history' not in history_dict:
-        history_dict['recommendations_history'] = []
+    history = history_dict.get('recommendations_history')
     
-    history_dict['recommendations_history'].append((base_song, len(recommendations)))
+    # A bounded deque evicts the oldest entry itself once max_history is reached
+    if not isinstance(history, deque) or history.maxlen != max_history:
+        history = deque(history or (), maxlen=max_history)
+        history_dict['recommendations_history'] = history
     
-    # Keep only recent history
-    if len(history_dict['recommendations_history']) > max_history:
-        history_dict['recommendations_history'] = history_dict['recommendations_history'][-max_history:]
\ No newline at end of file
+    history.append((base_song, len(recommendations)))
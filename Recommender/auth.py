@@ -1,6 +1,7 @@
 import os
 import sys
 import time
+from functools import lru_cache
 from pathlib import Path
 
 # Guard imports for optional third-party dependencies so missing packages
@@ -23,6 +24,13 @@ except Exception as e:  # pragma: no cover
         f"Original import error: {e}"
     )
 
+# Streamlit is optional here: scripts such as testAUTH.py authenticate without it
+try:
+    import streamlit as st
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+except ImportError:  # pragma: no cover
+    st = None
+
 
 # === PROJECT CONFIG ===
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -30,20 +38,57 @@ ENV_PATH = BASE_DIR / ".env"
 TOKEN_CACHE_DIR = BASE_DIR / ".cache"
 TOKEN_CACHE_FILE = TOKEN_CACHE_DIR / "spotify_token_cache"
 
-# === LOAD ENV ===
-if not ENV_PATH.exists():
-    raise FileNotFoundError(f"❌ Missing .env file at {ENV_PATH}")
-print(f"🔍 Looking for .env at: {ENV_PATH}")
+def _debug(*args):
+    """Print authentication diagnostics only when DEBUG_AUTH is set."""
+    if os.getenv("DEBUG_AUTH"):
+        print(*args)
 
-load_dotenv(dotenv_path=ENV_PATH)
-print("Loaded ID:", os.getenv("SPOTIPY_CLIENT_ID"))
-print("Environment variables loaded.")
 
-# === VALIDATE REQUIRED VARIABLES ===
+# === REQUIRED VARIABLES ===
 REQUIRED_ENV_VARS = ["SPOTIPY_CLIENT_ID", "SPOTIPY_CLIENT_SECRET", "SPOTIPY_REDIRECT_URI"]
-missing = [var for var in REQUIRED_ENV_VARS if not os.getenv(var)]
-if missing:
-    raise EnvironmentError(f"❌ Missing required environment variables: {', '.join(missing)}")
+
+
+@lru_cache(maxsize=None)
+def _load_env():
+    """
+    Load the project's .env file and validate the required Spotify variables.
+
+    Runs once per process on the first authentication instead of on import,
+    so Streamlit reruns and plain imports skip the file I/O.
+    """
+    # === LOAD ENV ===
+    if not ENV_PATH.exists():
+        raise FileNotFoundError(f"❌ Missing .env file at {ENV_PATH}")
+    _debug(f"🔍 Looking for .env at: {ENV_PATH}")
+
+    load_dotenv(dotenv_path=ENV_PATH)
+    _debug("Loaded ID:", os.getenv("SPOTIPY_CLIENT_ID"))
+    _debug("Environment variables loaded.")
+
+    # === VALIDATE REQUIRED VARIABLES ===
+    missing = [var for var in REQUIRED_ENV_VARS if not os.getenv(var)]
+    if missing:
+        raise EnvironmentError(f"❌ Missing required environment variables: {', '.join(missing)}")
+
+
+def _session_state():
+    """Return Streamlit's session state when running inside a Streamlit app, else None."""
+    if st is None or get_script_run_ctx() is None:
+        return None
+    return st.session_state
+
+
+def get_current_user(sp):
+    """
+    Return the current user's profile for an authenticated client.
+
+    Reuses the profile fetched by get_spotify_client for this session instead
+    of making another request to Spotify.
+    """
+    session = _session_state()
+    if session is not None and session.get("sp_client") is sp and "sp_current_user" in session:
+        return session["sp_current_user"]
+    return sp.current_user()
 
 
 def get_spotify_client(
@@ -54,10 +99,20 @@ def get_spotify_client(
     Authenticate and return a Spotify client using OAuth2.
     Handles caching, refresh, and retry logic.
 
+    Inside a Streamlit app the client and the user's profile are kept in the
+    session state, so later calls in the same session skip re-authentication.
+
     Returns:
         spotipy.Spotify: Authenticated Spotify client.
     """
 
+    # Reuse this session's client; it is per-user, so it is never shared via st.cache_resource
+    session = _session_state()
+    if session is not None and "sp_client" in session:
+        return session["sp_client"]
+
+    _load_env()
+
     # === REQUESTED SCOPES (FULL ACCESS FOR PERSONALIZATION & PLAYLISTS) ===
     scope = (
         "user-library-read "
@@ -83,8 +138,8 @@ def get_spotify_client(
                 pass
 
             redirect_uri = os.getenv("SPOTIPY_REDIRECT_URI")
-            print("\U0001f50d Using redirect URI:", redirect_uri)
-            print("\U0001f4be Token cache file:", str(TOKEN_CACHE_FILE))
+            _debug("\U0001f50d Using redirect URI:", redirect_uri)
+            _debug("\U0001f4be Token cache file:", str(TOKEN_CACHE_FILE))
 
             auth_manager = SpotifyOAuth(
                 client_id=os.getenv("SPOTIPY_CLIENT_ID"),
@@ -101,7 +156,11 @@ def get_spotify_client(
             print(f"✅ Spotify authentication successful. Logged in as: {current_user.get('display_name', 'Unknown User')}") # type: ignore
 
             # 🎯 Debug: Display the active scopes for verification
-            print("🎯 Active Spotify scopes:", auth_manager.scope)
+            _debug("🎯 Active Spotify scopes:", auth_manager.scope)
+
+            if session is not None:
+                session["sp_client"] = sp
+                session["sp_current_user"] = current_user
 
             return sp
 
@@ -1,5 +1,9 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 from pathlib import Path
 
 
@@ -72,7 +76,7 @@ def validate_and_clean_csv(csv_path, save_clean_copy=True):
         raise FileNotFoundError(error_msg)
 
     try:
-        df = pd.read_csv(csv_path)
+        df = pd.read_csv(csv_path, engine="pyarrow")
         print(f"✅ Successfully loaded CSV with {len(df)} rows and {len(df.columns)} columns")
         print(f"📋 Columns: {list(df.columns)}")
     except Exception as e:
@@ -92,16 +96,26 @@ def validate_and_clean_csv(csv_path, save_clean_copy=True):
 
     # Clean and validate IDs if they exist
     if "id" in df.columns:
-        df["id"] = df["id"].astype(str).str.strip()
+        # Strip and test for emptiness with Arrow string kernels in one pass
+        ids = pc.utf8_trim_whitespace(pa.array(df["id"].astype(str), type=pa.string()))
+        keep = pc.fill_null(pc.not_equal(ids, ""), False).to_numpy(zero_copy_only=False)
+        df["id"] = ids.to_numpy(zero_copy_only=False)
         # Remove rows with empty IDs but don't require strict Spotify ID format
         initial_count = len(df)
-        df = df[df["id"].str.len() > 0].copy()
+        df = df[keep].copy()
         removed_count = initial_count - len(df)
         if removed_count > 0:
             print(f"🧹 Removed {removed_count} rows with empty IDs")
 
     # Remove duplicates and reset index
-    duplicate_cols = ["id"] if "id" in df.columns else ["name", "artist"] if all(col in df.columns for col in ["name", "artist"]) else [df.columns[0]]
+    # Track identity: Spotify ID if present, otherwise title + artist ('name' or 'song' for the title)
+    title_col = next((col for col in ["name", "song"] if col in df.columns), None)
+    if "id" in df.columns:
+        duplicate_cols = ["id"]
+    elif title_col and "artist" in df.columns:
+        duplicate_cols = [title_col, "artist"]
+    else:
+        duplicate_cols = [df.columns[0]]
     
     initial_count = len(df)
     df.drop_duplicates(subset=duplicate_cols, inplace=True)
@@ -123,6 +137,81 @@ def validate_and_clean_csv(csv_path, save_clean_copy=True):
     return df
 
 
+# ----------------------------------------------------------
+# 🏷️ Categorical Text Columns
+# ----------------------------------------------------------
+# Repeated text columns stored as pandas Categoricals (integer codes)
+CATEGORICAL_COLUMNS = ["artist", "genre", "song"]
+
+
+def categorize_text_columns(df):
+    """
+    Convert repeated text columns to the pandas 'category' dtype.
+
+    nunique, value_counts and groupby on these columns then work on integer
+    codes instead of hashing strings on every call.
+    """
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("category")
+    return df
+
+
+# ----------------------------------------------------------
+# ⚡ Parquet Sidecar Cache
+# ----------------------------------------------------------
+# Bump whenever validate_and_clean_csv or categorize_text_columns changes what
+# they produce, so sidecars written by older code are rebuilt instead of reused
+CLEANING_VERSION = "2"
+CLEANING_VERSION_KEY = b"recommender_cleaning_version"
+
+
+def get_parquet_cache_path(csv_path):
+    """Return the path of the cleaned parquet copy kept next to the CSV."""
+    return Path(csv_path).with_suffix(".parquet")
+
+
+def load_parquet_cache(csv_path):
+    """
+    Load the cleaned parquet copy of the CSV if it is up to date.
+
+    Returns None when the parquet file is missing, older than the CSV, or was
+    written by a different CLEANING_VERSION.
+    """
+    csv_path = Path(csv_path)
+    parquet_path = get_parquet_cache_path(csv_path)
+
+    if not parquet_path.exists() or not csv_path.exists():
+        return None
+    if parquet_path.stat().st_mtime < csv_path.stat().st_mtime:
+        return None
+
+    try:
+        metadata = pq.read_schema(parquet_path).metadata or {}
+    except Exception:
+        return None
+    if metadata.get(CLEANING_VERSION_KEY) != CLEANING_VERSION.encode():
+        print(f"🔄 Parquet cache was written by another cleaning version; rebuilding: {parquet_path}")
+        return None
+
+    df = pd.read_parquet(parquet_path, engine="pyarrow")
+    print(f"⚡ Loaded {len(df)} cleaned tracks from cache: {parquet_path}")
+    return df
+
+
+def save_parquet_cache(df, csv_path):
+    """Write the cleaned DataFrame next to the CSV so later loads skip cleaning."""
+    parquet_path = get_parquet_cache_path(csv_path)
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        metadata = {**(table.schema.metadata or {}), CLEANING_VERSION_KEY: CLEANING_VERSION.encode()}
+        pq.write_table(table.replace_schema_metadata(metadata), parquet_path)
+        print(f"💾 Cached cleaned tracks at: {parquet_path}")
+    except Exception as e:
+        # The cache is only an optimisation; loading still works without it
+        print(f"⚠️ Could not write parquet cache: {e}")
+
+
 # ----------------------------------------------------------
 # 🎧 Load Songs from CSV with Audio Features
 # ----------------------------------------------------------
@@ -144,8 +233,14 @@ def load_songs_from_csv(csv_path=None, sp=None):
     print(f"📁 Loading songs from: {csv_path}")
     
     try:
-        # ✅ Step 1: Validate and clean the CSV file
-        df = validate_and_clean_csv(csv_path, save_clean_copy=False)
+        # ✅ Step 1: Reuse the cleaned parquet copy, or validate and clean the CSV file
+        df = load_parquet_cache(csv_path)
+        if df is None:
+            df = categorize_text_columns(validate_and_clean_csv(csv_path, save_clean_copy=False))
+            save_parquet_cache(df, csv_path)
+        else:
+            # Parquet copies written before categorization still hold plain strings
+            df = categorize_text_columns(df)
         
         # ✅ Step 2: Ensure we have the required audio feature columns
         audio_feature_columns = [
@@ -183,6 +278,41 @@ def load_songs_from_csv(csv_path=None, sp=None):
         raise  # Re-raise the exception so callers can handle it
 
 
+# ----------------------------------------------------------
+# 🎧 Fetch Audio Features in Batches
+# ----------------------------------------------------------
+# The audio-features endpoint accepts at most 100 track IDs per request
+AUDIO_FEATURES_BATCH_SIZE = 100
+
+
+def fetch_audio_features(sp, track_ids, batch_size=AUDIO_FEATURES_BATCH_SIZE, max_workers=2):
+    """
+    Fetch Spotify audio features for many tracks with as few requests as possible.
+
+    Args:
+        sp (spotipy.Spotify): Authenticated Spotify client
+        track_ids (list): Spotify track IDs
+        batch_size (int): IDs per request, capped at the endpoint's limit of 100
+        max_workers (int): Concurrent requests; kept low to stay within rate limits
+
+    Returns:
+        list: One audio-features dict per track ID, in order (None where Spotify has none)
+    """
+    track_ids = list(track_ids)
+    batch_size = max(1, min(batch_size, AUDIO_FEATURES_BATCH_SIZE))
+    batches = [track_ids[i:i + batch_size] for i in range(0, len(track_ids), batch_size)]
+    
+    if not batches:
+        return []
+    
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(batches)))) as executor:
+        results = executor.map(lambda batch: sp.audio_features(batch) or [None] * len(batch), batches)
+        features = [item for batch_features in results for item in batch_features]
+    
+    print(f"🎧 Fetched audio features for {len(track_ids)} tracks in {len(batches)} requests")
+    return features
+
+
 # ----------------------------------------------------------
 # 🔐 Return Authenticated Spotify Client (for UI purposes)
 # ----------------------------------------------------------
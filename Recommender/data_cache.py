@@ -0,0 +1,52 @@
+# Recommender/data_cache.py
+
+import os
+
+import streamlit as st
+
+from Recommender.data import load_songs_from_csv, DEFAULT_CSV_PATH
+
+
+# Only the current version of the library is requested again, so keep a single
+# entry instead of one full DataFrame per edit of the CSV
+@st.cache_data(show_spinner=False, max_entries=1)
+def _load_library_cached(path, mtime):
+    """Parse and clean the library once per (path, modification time)."""
+    df = load_songs_from_csv(path)
+    # Lets downstream caches key on the file version instead of hashing the frame
+    df.attrs['library_source'] = (str(path), mtime)
+    return df
+
+
+def load_library(path=DEFAULT_CSV_PATH):
+    """
+    Load the song library, reusing the parsed DataFrame across reruns and pages.
+
+    The file's modification time is part of the cache key, so editing the CSV
+    invalidates the cached copy on the next rerun. The (path, mtime) pair is
+    also stored in df.attrs['library_source'] for the recommendation caches.
+    Song and artist counts are stored in st.session_state['stats'] for the
+    sidebar and stats panels.
+
+    Args:
+        path (str): Path to the songs CSV
+
+    Returns:
+        pd.DataFrame: Cleaned songs with their audio features
+    """
+    try:
+        mtime = os.path.getmtime(path)
+    except (OSError, TypeError):
+        # Let load_songs_from_csv resolve the default path and report a missing file
+        mtime = None
+    df = _load_library_cached(path, mtime)
+
+    # Library stats are read on every rerun; count them once per loaded file
+    stats = st.session_state.get('stats')
+    if stats is None or stats.get('source') != (path, mtime):
+        st.session_state['stats'] = {
+            'source': (path, mtime),
+            'n_songs': len(df),
+            'n_artists': int(df['artist'].nunique()) if 'artist' in df.columns else 0,
+        }
+    return df
@@ -2,7 +2,7 @@
 
 import os
 import streamlit as st
-from Recommender.auth import get_spotify_client
+from Recommender.auth import get_spotify_client, get_current_user
 
 def render_login_page():
     """
@@ -36,7 +36,7 @@ def render_login_page():
         with st.spinner("Connecting to Spotify..."):
             try:
                 sp = get_spotify_client()
-                current_user = sp.current_user() # type: ignore
+                current_user = get_current_user(sp)
                 user_id = current_user.get("id", "Unknown User") # type: ignore
                 display_name = current_user.get("display_name") or user_id # type: ignore
                 
@@ -83,6 +83,6 @@ def logout():
     """
     Clear authentication from session state.
     """
-    for key in ['sp', 'user_id', 'display_name', 'authenticated']:
+    for key in ['sp', 'user_id', 'display_name', 'authenticated', 'sp_client', 'sp_current_user']:
         if key in st.session_state:
             del st.session_state[key]
\ No newline at end of file
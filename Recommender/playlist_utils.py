@@ -1,8 +1,125 @@
 # Recommender/playlist_utils.py
 
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import spotipy
 from spotipy.oauth2 import SpotifyOAuth
 import streamlit as st
+from Recommender.uri_cache import load_cache, save_cache
+
+# Spotify search requests run concurrently, spaced to stay near ~10 requests/second.
+# Rate-limited (429) responses are retried by spotipy after the Retry-After delay.
+SEARCH_MAX_WORKERS = 4
+SEARCH_MIN_INTERVAL = 0.1
+
+
+class _RateLimiter:
+    """Space out calls across threads so at most one starts per interval."""
+
+    def __init__(self, min_interval):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.min_interval
+        if start > now:
+            time.sleep(start - now)
+
+
+def _uri_cache():
+    """
+    Return this session's cache of Spotify track URIs keyed by (track, artist).
+    Seeded from the on-disk cache the first time it is used in a session.
+    """
+    if 'uri_cache' not in st.session_state:
+        st.session_state['uri_cache'] = load_cache()
+    return st.session_state['uri_cache']
+
+
+def _uri_cache_key(track_name, artist_name=None):
+    """Case-insensitive cache key for a track/artist search."""
+    return (str(track_name).lower(), str(artist_name or '').lower())
+
+
+def _query_track_uri(sp: spotipy.Spotify, track_name: str, artist_name: str = None): # type: ignore
+    """Run one Spotify track search and return the best match's URI, or None."""
+    query = f"track:{track_name}"
+    if artist_name:
+        query += f" artist:{artist_name}"
+    
+    results = sp.search(q=query, type='track', limit=1)
+    
+    if results['tracks']['items']: # type: ignore
+        return results['tracks']['items'][0]['uri'] # type: ignore
+    return None
+
+
+def _search_track_uris(sp: spotipy.Spotify, songs_df):
+    """
+    Search Spotify for every song/artist row of the DataFrame concurrently.
+    Tracks already found (in this or an earlier session) are taken from the URI cache,
+    and newly found URIs are persisted to disk.
+
+    Returns:
+        tuple: (uris, added_songs, failed_songs) in the DataFrame's row order
+    """
+    n_rows = len(songs_df)
+    song_names = songs_df['song'].astype(str).tolist() if 'song' in songs_df.columns else ['Unknown Song'] * n_rows
+    artist_names = songs_df['artist'].astype(str).tolist() if 'artist' in songs_df.columns else ['Unknown Artist'] * n_rows
+    tracks = list(zip(song_names, artist_names))
+    
+    # Only search for tracks not found before, once per cache key so case variants share a search
+    cache = _uri_cache()
+    pending = {}
+    for track in tracks:
+        key = _uri_cache_key(*track)
+        if key not in cache:
+            pending.setdefault(key, track)
+    limiter = _RateLimiter(SEARCH_MIN_INTERVAL)
+    
+    def lookup(track):
+        limiter.wait()
+        try:
+            return _query_track_uri(sp, *track), None
+        except Exception as e:
+            return None, e
+    
+    # Searches are I/O-bound, so threads overlap the HTTP round-trips
+    errors = {}
+    found = {}
+    if pending:
+        with ThreadPoolExecutor(max_workers=SEARCH_MAX_WORKERS) as executor:
+            for key, (track_uri, error) in zip(pending, executor.map(lookup, pending.values())):
+                if track_uri:
+                    found[key] = track_uri
+                elif error is not None:
+                    errors[key] = error
+    if found:
+        cache.update(found)
+        save_cache(found)
+    
+    uris = []
+    added_songs = []
+    failed_songs = []
+    for song_name, artist_name in tracks:
+        key = _uri_cache_key(song_name, artist_name)
+        track_uri = cache.get(key)
+        error = errors.get(key)
+        if track_uri:
+            uris.append(track_uri)
+            added_songs.append(f"{song_name} - {artist_name}")
+        elif error is not None:
+            failed_songs.append(f"{song_name} - {artist_name} (Error: {str(error)})")
+        else:
+            failed_songs.append(f"{song_name} - {artist_name}")
+    
+    return uris, added_songs, failed_songs
+
 
 def create_playlist_from_recommendations(sp: spotipy.Spotify, user_id: str, base_song: str, rec_df):
     """
@@ -20,29 +137,8 @@ def create_playlist_from_recommendations(sp: spotipy.Spotify, user_id: str, base
         description=description
     )
 
-    uris = []
-    added_songs = []
-    failed_songs = []
-    
     # Search for each recommended song on Spotify
-    for _, row in rec_df.iterrows():
-        try:
-            song_name = row['song'] if 'song' in row else 'Unknown Song'
-            artist_name = row['artist'] if 'artist' in row else 'Unknown Artist'
-            
-            # Search for the song on Spotify
-            query = f"track:{song_name} artist:{artist_name}"
-            results = sp.search(q=query, type='track', limit=1)
-            
-            if results['tracks']['items']: # type: ignore
-                track_uri = results['tracks']['items'][0]['uri'] # type: ignore
-                uris.append(track_uri)
-                added_songs.append(f"{song_name} - {artist_name}")
-            else:
-                failed_songs.append(f"{song_name} - {artist_name}")
-                
-        except Exception as e:
-            failed_songs.append(f"{song_name} - {artist_name} (Error: {str(e)})") # type: ignore
+    uris, added_songs, failed_songs = _search_track_uris(sp, rec_df)
     
     if not uris:
         st.warning("No songs could be found on Spotify to add to playlist.")
@@ -84,29 +180,8 @@ def create_playlist_from_selected_songs(sp: spotipy.Spotify, user_id: str, playl
         description=description
     )
 
-    uris = []
-    added_songs = []
-    failed_songs = []
-    
     # Search for each song on Spotify
-    for _, row in selected_songs_df.iterrows():
-        try:
-            song_name = row['song']
-            artist_name = row['artist']
-            
-            # Search for the song on Spotify
-            query = f"track:{song_name} artist:{artist_name}"
-            results = sp.search(q=query, type='track', limit=1)
-            
-            if results['tracks']['items']: # type: ignore
-                track_uri = results['tracks']['items'][0]['uri'] # type: ignore
-                uris.append(track_uri)
-                added_songs.append(f"{song_name} - {artist_name}")
-            else:
-                failed_songs.append(f"{song_name} - {artist_name}")
-                
-        except Exception as e:
-            failed_songs.append(f"{row['song']} - {row['artist']} (Error: {str(e)})")
+    uris, added_songs, failed_songs = _search_track_uris(sp, selected_songs_df)
     
     if not uris:
         st.warning("No songs could be found on Spotify to add to playlist.")
@@ -140,18 +215,19 @@ def search_spotify_uri(sp: spotipy.Spotify, track_name: str, artist_name: str =
     """
     Search for a song on Spotify to get its URI.
     Useful if your CSV doesn't have Spotify URIs but has song names and artists.
+    Found URIs are cached (and persisted to disk), so repeated lookups skip the API call.
     """
+    cache = _uri_cache()
+    key = _uri_cache_key(track_name, artist_name)
+    if key in cache:
+        return cache[key]
+    
     try:
-        query = f"track:{track_name}"
-        if artist_name:
-            query += f" artist:{artist_name}"
-        
-        results = sp.search(q=query, type='track', limit=1)
-        
-        if results['tracks']['items']: # type: ignore
-            return results['tracks']['items'][0]['uri'] # type: ignore
-        else:
-            return None
+        track_uri = _query_track_uri(sp, track_name, artist_name)
+        if track_uri:
+            cache[key] = track_uri
+            save_cache({key: track_uri})
+        return track_uri
     except Exception as e:
         st.error(f"Error searching for {track_name}: {e}")
         return None
\ No newline at end of file
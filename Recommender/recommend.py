@@ -1,22 +1,98 @@
+from urllib.parse import quote
+import numpy as np
 import pandas as pd
+import streamlit as st
 from sklearn.preprocessing import StandardScaler
-from sklearn.metrics.pairwise import cosine_similarity
 
-def recommend_from_song(song_name, df, n=10):
-    """Recommend top-n similar songs to the selected song."""
-    # Use the actual column names from your CSV
-    track_column = 'song'  # Your CSV uses 'song' not 'track' or 'name'
-    artist_column = 'artist'
-    
-    print(f"🔍 Using track column: '{track_column}', artist column: '{artist_column}'")
-    print(f"🔍 Looking for song: '{song_name}'")
-    
-    # Check if song exists in dataframe
-    if song_name not in df[track_column].values:
-        available_songs = df[track_column].unique()[:10]  # Show first 10 available songs
-        print(f"❌ Song '{song_name}' not found. Available songs: {available_songs}")
-        return pd.DataFrame()
+# Optional Numba acceleration for building the feature matrix; without it the
+# NumPy/scikit-learn path below is used
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover
+    njit = None
+
+
+def _scale_and_normalize_numpy(X):
+    """Standardize the columns of X, then L2-normalize its rows (in place where possible)."""
+    X = StandardScaler(copy=False).fit_transform(X)
+    norms = np.linalg.norm(X, axis=1, keepdims=True)
+    X /= np.where(norms == 0, 1, norms)
+    return X
+
+
+if njit is not None:
+    @njit(fastmath=True, cache=True)
+    def _scale_and_normalize(X):
+        """
+        Standardize the columns of X, then L2-normalize its rows, in place.
+
+        Two row-major passes: one for the column statistics, one that scales,
+        accumulates the row norm and normalizes while the row is still in cache.
+        Expects a C-contiguous matrix; on a Fortran-ordered one every row walk is strided.
+        Constant columns and all-zero rows become 0, as with StandardScaler.
+        """
+        N, F = X.shape
+        mean = np.zeros(F)
+        sq = np.zeros(F)
+        for i in range(N):
+            for j in range(F):
+                v = X[i, j]
+                mean[j] += v
+                sq[j] += v * v
+
+        inv_std = np.zeros(F)
+        for j in range(F):
+            mean[j] /= N
+            var = sq[j] / N - mean[j] * mean[j]
+            inv_std[j] = 1.0 / np.sqrt(var) if var > 1e-12 else 0.0
+
+        for i in range(N):
+            norm = 0.0
+            for j in range(F):
+                v = (X[i, j] - mean[j]) * inv_std[j]
+                X[i, j] = v
+                norm += v * v
+            if norm > 0.0:
+                inv_norm = 1.0 / np.sqrt(norm)
+                for j in range(F):
+                    X[i, j] *= inv_norm
+        return X
+else:
+    _scale_and_normalize = _scale_and_normalize_numpy
+
+
+def _library_key(df):
+    """
+    Cache key identifying the library version of df.
+
+    Frames from load_library carry their (path, mtime) in df.attrs; any other frame
+    is keyed on a hash of its full contents. Streamlit would otherwise hash only a
+    sample of the rows of large frames, and could miss an edit outside that sample.
+    """
+    source = df.attrs.get('library_source')
+    if source is not None:
+        return ('file',) + tuple(source)
+    return ('content', int(pd.util.hash_pandas_object(df).sum()), tuple(df.columns))
+
 
+# Only the current library version is requested again; one entry keeps a single
+# feature matrix resident instead of one per edit of the CSV
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _build_feature_cache(_df, library_key):
+    """
+    Scale and L2-normalize the song features once per library version and index songs by name.
+
+    Cached across reruns so each recommendation only pays for one matrix-vector product.
+    Keyed on library_key (see _library_key); the frame itself is not hashed.
+    The matrix is always C-contiguous float32 so that product runs as a BLAS sgemv:
+    standardized, unit-length audio features need no more precision, and half the
+    bytes of float64 doubles the throughput of this memory-bound sweep.
+
+    Returns:
+        tuple: (features_norm, song_to_idx) - float32 matrix of standardized,
+        unit-length feature rows and a dict mapping each song name to its first row position
+    """
+    df = _df
     # Select numeric features only (exclude non-feature columns)
     exclude_cols = ['artist', 'song', 'duration_ms', 'explicit', 'year', 'popularity', 'genre']
     numeric_cols = df.select_dtypes(include=['float64', 'int64']).columns
@@ -31,34 +107,69 @@ def recommend_from_song(song_name, df, n=10):
     if not feature_cols:
         raise ValueError("No numeric features found for recommendations")
     
-    numeric_df = df[feature_cols].fillna(0)
+    # Fill one C-ordered float32 matrix column by column (missing values as 0).
+    # DataFrame.to_numpy would return a Fortran-ordered block that needs a second
+    # full copy to become row-major; scaling and normalizing below are in place
+    features = np.empty((len(df), len(feature_cols)), dtype=np.float32)
+    for j, col in enumerate(feature_cols):
+        features[:, j] = df[col].to_numpy(dtype=np.float32, na_value=0)
+
+    # Scale features, then normalize rows once so cosine similarity reduces to a dot product
+    # (already C-contiguous float32, so no copy is made here)
+    features_norm = np.ascontiguousarray(_scale_and_normalize(features), dtype=np.float32)
 
-    # Scale features
-    scaler = StandardScaler()
-    features_scaled = scaler.fit_transform(numeric_df)
+    # Walk the names backwards so the first occurrence of a duplicate name wins
+    songs = df['song'].to_numpy()
+    song_to_idx = dict(zip(songs[::-1], range(len(songs) - 1, -1, -1)))
 
-    # Locate the index of the selected song
-    idx = df[df[track_column] == song_name].index[0]
-    target_vector = features_scaled[idx].reshape(1, -1)
+    return features_norm, song_to_idx
 
-    # Compute similarity between selected song and all others (vector vs matrix)
-    sims = cosine_similarity(target_vector, features_scaled)[0]
 
-    # Get top N similar songs (excluding itself)
-    similar_indices = sims.argsort()[::-1][1:n+1]
+def recommend_from_song(song_name, df, n=10):
+    """Recommend top-n similar songs to the selected song."""
+    # Use the actual column names from your CSV
+    track_column = 'song'  # Your CSV uses 'song' not 'track' or 'name'
+    artist_column = 'artist'
+    
+    print(f"🔍 Using track column: '{track_column}', artist column: '{artist_column}'")
+    print(f"🔍 Looking for song: '{song_name}'")
     
-    # Build recommendations - get the original rows with all columns
-    recs = df.iloc[similar_indices].copy()
+    features_norm, song_to_idx = _build_feature_cache(df, _library_key(df))
+
+    # Locate the row of the selected song (one dict lookup instead of scanning the column)
+    idx = song_to_idx.get(song_name)
+    if idx is None:
+        available_songs = df[track_column].unique()[:10]  # Show first 10 available songs
+        print(f"❌ Song '{song_name}' not found. Available songs: {available_songs}")
+        return pd.DataFrame()
+
+    # Cosine similarity between selected song and all others (one float32 matrix-vector product).
+    # An int8-quantized first pass was measured and is slower here: NumPy has no integer BLAS,
+    # so q @ v upcasts the matrix (~7x slower than this GEMV at 1M x 12). A Numba float32 loop
+    # was also measured: it was ~7-12% faster only with 11 features at 200k-1M songs, and
+    # slower or even at 16-32 features and on small libraries, so the GEMV was kept
+    sims = features_norm @ features_norm[idx]
+
+    # Get top N similar songs (excluding itself): partition out the n+1 best
+    # candidates in O(N), then sort only those instead of every song
+    k = min(n + 1, len(sims))
+    top = np.argpartition(-sims, k - 1)[:k]
+    top = top[np.argsort(-sims[top])]
+    similar_indices = top[top != idx][:n]
     
-    # Add similarity scores to the recommendations
-    recs = recs.copy()  # Ensure we're working with a copy
-    recs['similarity'] = sims[similar_indices]
+    # Build recommendations from only the columns the UI and playlist creation read,
+    # instead of copying every audio feature of the selected rows
+    recs = pd.DataFrame({
+        artist_column: df[artist_column].to_numpy()[similar_indices],
+        track_column: df[track_column].to_numpy()[similar_indices],
+        'similarity': sims[similar_indices],
+    })
 
     # Add Spotify search links (since we don't have Spotify IDs in your CSV)
-    recs['spotify_link'] = recs.apply(
-        lambda row: f"https://open.spotify.com/search/{row['artist']}%20{row['song']}".replace(' ', '%20'),
-        axis=1
-    )
+    # Percent-encode artist and title so characters such as '/', '?' or '#' keep the link valid
+    artist_query = recs[artist_column].astype(str).map(lambda text: quote(text, safe=''))
+    song_query = recs[track_column].astype(str).map(lambda text: quote(text, safe=''))
+    recs['spotify_link'] = "https://open.spotify.com/search/" + artist_query + "%20" + song_query
 
     print(f"✅ Generated {len(recs)} recommendations for '{song_name}'")
     print(f"🔍 Recommendation columns: {list(recs.columns)}")
@@ -67,15 +178,32 @@ def recommend_from_song(song_name, df, n=10):
 
 def get_available_songs(df):
     """Get list of available songs for the dropdown."""
+    return _available_songs(df, _library_key(df))
+
+
+@st.cache_data(show_spinner=False, max_entries=1)
+def _available_songs(_df, library_key):
+    """Dropdown labels for one library version; the frame itself is not hashed."""
+    df = _df
     track_column = 'song'
     artist_column = 'artist'
     
-    return [f"{row[track_column]} - {row[artist_column]}" for _, row in df.iterrows()]
+    songs = df[track_column].to_numpy()
+    artists = df[artist_column].to_numpy()
+    return [f"{song} - {artist}" for song, artist in zip(songs, artists)]
 
 
 def get_song_mapping(df):
     """Create mapping between display names and actual song names."""
+    return _song_mapping(df, _library_key(df))
+
+
+@st.cache_data(show_spinner=False, max_entries=1)
+def _song_mapping(_df, library_key):
+    """Display name -> song name for one library version; the frame itself is not hashed."""
+    df = _df
     track_column = 'song'
-    artist_column = 'artist'
     
-    return {f"{row[track_column]} - {row[artist_column]}": row[track_column] for _, row in df.iterrows()}
\ No newline at end of file
+    # Keys are the dropdown labels themselves, so every option maps back to its song
+    labels = _available_songs(df, library_key)
+    return dict(zip(labels, df[track_column].to_numpy()))
@@ -1,6 +1,7 @@
 # Recommender/ui.py
 
 import streamlit as st
+from Recommender.playlist_utils import create_playlist_from_recommendations
 
 class SpotifyUI:
     """
@@ -111,11 +112,12 @@ class SpotifyUI:
     def _render_sidebar_stats(self, df):
         """Render statistics in the sidebar."""
         if df is not None:
+            stats = self._library_stats(df)
             col1, col2 = st.columns(2)
             with col1:
-                st.metric("Total Songs", len(df))
+                st.metric("Total Songs", stats['n_songs'])
             with col2:
-                st.metric("Unique Artists", df['artist'].nunique())
+                st.metric("Unique Artists", stats['n_artists'])
         else:
             st.info("📥 Load dataset to see stats")
     
@@ -153,9 +155,17 @@ class SpotifyUI:
     
     def _render_quick_stats(self, df):
         """Render quick stats in the recommendation section."""
+        stats = self._library_stats(df)
         st.markdown("### 📈 Library Stats")
-        st.metric("Songs in Library", len(df))
-        st.metric("Artists", df['artist'].nunique())
+        st.metric("Songs in Library", stats['n_songs'])
+        st.metric("Artists", stats['n_artists'])
+    
+    def _library_stats(self, df):
+        """Song and artist counts cached by load_library, computed directly if absent."""
+        stats = st.session_state.get('stats')
+        if stats is None or stats['n_songs'] != len(df):
+            stats = {'n_songs': len(df), 'n_artists': df['artist'].nunique()}
+        return stats
     
     def render_recommendation_results(self, recs, selected_song_name, sp, user_id):
         """
@@ -187,8 +197,6 @@ class SpotifyUI:
     
     def _render_playlist_creation(self, recs, selected_song_name, sp, user_id):
         """Render playlist creation options."""
-        from Recommender.playlist_utils import create_playlist_from_recommendations
-        
         st.markdown("---")
         col1, col2 = st.columns(2)
         
@@ -202,16 +210,25 @@ class SpotifyUI:
                 st.markdown(f"🎵 [Open Playlist on Spotify]({playlist_url})")
     
     def render_custom_playlist_section(self, df, available_songs, sp, user_id):
-        """Render the custom playlist creation section."""
+        """
+        Render the custom playlist creation section.
+        
+        Returns:
+            tuple: (selected_row_positions, playlist_name, playlist_description) when the
+            create button is clicked, otherwise (None, None, None)
+        """
         st.markdown("---")
         st.markdown('<div class="section-header">🛠️ Create Custom Playlist</div>', unsafe_allow_html=True)
         
         col1, col2 = st.columns([3, 2])
         
         with col1:
+            # Options are row positions labelled with "song - artist", so the selection
+            # maps straight back to DataFrame rows (and same-titled songs stay distinct)
             selected_songs_for_playlist = st.multiselect(
                 "Choose songs for your custom playlist:",
-                options=available_songs,
+                options=range(len(available_songs)),
+                format_func=available_songs.__getitem__,
                 help="Select multiple songs to include in your custom playlist",
                 max_selections=50
             )
@@ -0,0 +1,60 @@
+# Recommender/uri_cache.py
+
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+# Stored next to the Spotify token cache so found URIs survive app restarts
+URI_CACHE_FILE = Path(__file__).resolve().parent.parent / ".cache" / "spotify_uri_cache.json"
+
+# Streamlit sessions run in threads of one process; serialize the load-merge-write
+# so one session's new URIs are never dropped by another's concurrent save
+_SAVE_LOCK = threading.Lock()
+
+
+def load_cache(path=URI_CACHE_FILE):
+    """
+    Load the persisted Spotify track URIs.
+
+    Returns:
+        dict: (track, artist) cache key -> Spotify URI; empty if the file is missing or unreadable
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            entries = json.load(f)
+        return {(track, artist): uri for track, artist, uri in entries}
+    except (OSError, ValueError, TypeError):
+        return {}
+
+
+def save_cache(cache, path=URI_CACHE_FILE):
+    """
+    Persist Spotify track URIs, merged with any entries already on disk.
+
+    Args:
+        cache (dict): (track, artist) cache key -> Spotify URI
+    """
+    path = Path(path)
+
+    with _SAVE_LOCK:
+        merged = load_cache(path)
+        merged.update(cache)
+
+        tmp_path = None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a unique temporary file first so a crash or a concurrent
+            # writer never leaves a truncated or interleaved cache
+            with tempfile.NamedTemporaryFile(
+                "w", encoding="utf-8", dir=path.parent, prefix=path.stem, suffix=".tmp", delete=False
+            ) as f:
+                tmp_path = f.name
+                json.dump([[track, artist, uri] for (track, artist), uri in merged.items()], f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            # The cache is only an optimisation; playlists still work without it
+            print(f"⚠️ Could not write Spotify URI cache: {e}")
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
@@ -4,7 +4,7 @@ Streamlit app: Music Recommender with Dedicated UI
 
 import streamlit as st
 from Recommender.ui import SpotifyUI
-from Recommender.data import load_songs_from_csv, DEFAULT_CSV_PATH
+from Recommender.data_cache import load_library
 from Recommender.recommend import recommend_from_song, get_available_songs, get_song_mapping
 from Recommender.playlist_utils import create_playlist_from_selected_songs
 from Recommender.login import render_login_page, check_authentication, logout
@@ -24,7 +24,7 @@ def main():
     # Load data
     try:
         with ui.show_loading_message("🎵 Loading your music library..."):
-            df = load_songs_from_csv(DEFAULT_CSV_PATH, sp)
+            df = load_library()
         ui.show_success_message(f"✅ Loaded {len(df)} songs from your library")
     except Exception as e:
         ui.show_error_message(f"❌ Error loading songs: {e}")
@@ -73,7 +73,7 @@ def main():
         df, available_songs, sp, user_id
     )
     
-    if selected_songs and playlist_name:
+    if selected_songs is not None:
         if not selected_songs:
             ui.show_warning_message("⚠️ Please select at least one song for your playlist.")
         elif not playlist_name.strip():
@@ -81,8 +81,8 @@ def main():
         else:
             try:
                 with ui.show_loading_message("Creating your custom playlist..."):
-                    selected_song_names = [song.split(" - ")[0] for song in selected_songs]
-                    selected_songs_df = df[df['song'].isin(selected_song_names)]
+                    # The multiselect returns row positions, so no scan of the library is needed
+                    selected_songs_df = df.iloc[selected_songs]
                     
                     playlist_url = create_playlist_from_selected_songs(
                         sp, user_id, playlist_name, playlist_desc, selected_songs_df # type: ignore
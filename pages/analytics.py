@@ -7,7 +7,7 @@ import os
 # Add the parent directory to the path so we can import from Recommender
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from Recommender.data import load_songs_from_csv, DEFAULT_CSV_PATH
+from Recommender.data_cache import load_library
 from Recommender.analytics import show_analytics_dashboard
 from Recommender.login import check_authentication
 
@@ -32,15 +32,16 @@ def main():
     try:
         # Load the data
         with st.spinner("📥 Loading dataset..."):
-            df = load_songs_from_csv(DEFAULT_CSV_PATH, sp)
+            df = load_library()
         
         # Show quick dataset info
         with st.expander("🔍 Dataset Overview"):
+            stats = st.session_state['stats']
             col1, col2, col3 = st.columns(3)
             with col1:
-                st.metric("Total Songs", len(df))
+                st.metric("Total Songs", stats['n_songs'])
             with col2:
-                st.metric("Unique Artists", df['artist'].nunique())
+                st.metric("Unique Artists", stats['n_artists'])
             with col3:
                 st.metric("Data Features", len(df.columns))
         
@@ -2,6 +2,7 @@ import spotipy
 from spotipy.oauth2 import SpotifyOAuth
 import os
 from dotenv import load_dotenv
+from Recommender.data import fetch_audio_features
 
 load_dotenv()
 
@@ -12,10 +13,10 @@ sp = spotipy.Spotify(auth_manager=SpotifyOAuth(
     scope="user-library-read"
 ))
 
-# Test with a single track ID from your dataset
-track_id = "2AmjYouvSZkOnEoZZ1CD6u"  
+# Test with track IDs from your dataset; they are sent in batches of up to 100 per request
+track_ids = ["2AmjYouvSZkOnEoZZ1CD6u"]
 try:
-    features = sp.audio_features([track_id])
+    features = fetch_audio_features(sp, track_ids)
     print(features)
 except Exception as e:
     print("Error:", e)